@@ -3,106 +3,223 @@
 Parse ESLint output and fix all no-unused-vars errors.
 """
 
+import functools
+import json
 import re
 import subprocess
+import sys
+from collections import defaultdict
 from pathlib import Path
 
+import fix_cache
+
+# Patterns for variable declarations
+PATTERN_TEMPLATES = [
+    (r'\b(const|let|var)\s+{v}\b', r'\1 _{v}'),
+    (r'\(([^,)]*,\s*)?{v}([,\s)])', r'(\1_{v}\2'),
+    (r'{{\s*{v}\s*([,}}])', r'{{ _{v}\1'),
+]
+
+NEWLINE_RE = re.compile(rb'\n')
+
+# Variable name from an ESLint message, e.g. "'foo' is defined but never used."
+MESSAGE_VAR_RE = re.compile(r"'([^']+)'")
+
+@functools.lru_cache(maxsize=None)
+def compiled_patterns(var_name):
+    """Compile PATTERN_TEMPLATES for a variable name once per run, as bytes patterns."""
+    esc = re.escape(var_name)
+    return [
+        (
+            re.compile(template.format(v=esc).encode('utf-8')),
+            replacement.format(v=var_name).encode('utf-8'),
+        )
+        for template, replacement in PATTERN_TEMPLATES
+    ]
+
+@functools.lru_cache(maxsize=None)
+def prefixed_pattern(var_name):
+    """Match `_name` as a whole identifier, not as the tail of e.g. DB_HOST or user_id."""
+    return re.compile(rb'(?<![\w$])_' + re.escape(var_name.encode('utf-8')) + rb'(?![\w$])')
+
+@functools.lru_cache(maxsize=None)
+def bare_pattern(var_name):
+    """Match the unprefixed name as a whole identifier."""
+    return re.compile(rb'(?<![\w$])' + re.escape(var_name.encode('utf-8')) + rb'(?![\w$])')
+
 def run_eslint():
-    """Run ESLint and get the output."""
+    """Run ESLint with the JSON formatter and return the parsed report."""
     result = subprocess.run(
-        ['npx', 'eslint', '.'],
+        ['npx', 'eslint', '.', '-f', 'json'],
         capture_output=True,
         text=True,
-        cwd=Path(__file__).parent
+        cwd=Path(__file__).parent,
+        check=False
     )
-    return result.stdout + result.stderr
-
-def parse_eslint_output(output):
-    """Parse ESLint output to extract no-unused-vars errors."""
+    # A config or plugin load error leaves stdout empty; report it instead of a traceback
+    if not result.stdout.strip():
+        print(f"ESLint produced no report (exit code {result.returncode})")
+        if result.stderr.strip():
+            print(result.stderr.strip())
+        return []
+    return json.loads(result.stdout)
+
+def parse_eslint_report(report):
+    """Extract (file, line, column, var) no-unused-vars error tuples from an ESLint JSON report."""
     errors = []
-    current_file = None
-
-    for line in output.split('\n'):
-        # Check for file path
-        if line.startswith('C:\\'):
-            current_file = line.strip()
-        # Check for no-unused-vars error
-        elif 'no-unused-vars' in line and current_file:
-            # Extract line number and variable name
-            match = re.match(r'\s*(\d+):\d+\s+error\s+\'([^\']+)\'', line)
+
+    for file_report in report:
+        file_path = file_report['filePath']
+        for msg in file_report['messages']:
+            # Only errors (severity 2) from no-unused-vars
+            if msg.get('ruleId') != 'no-unused-vars' or msg.get('severity') != 2:
+                continue
+            match = MESSAGE_VAR_RE.search(msg['message'])
             if match:
-                line_num = int(match.group(1))
-                var_name = match.group(2)
-                errors.append({
-                    'file': current_file,
-                    'line': line_num,
-                    'var': var_name
-                })
+                errors.append((file_path, msg['line'], msg['column'], match.group(1)))
 
     return errors
 
-def fix_unused_var(file_path, line_num, var_name):
-    """Add underscore prefix to a variable declaration."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+def fix_unused_var(line, var_name, column=None):
+    """Add underscore prefix to a variable declaration on a single line.
+
+    ESLint reports the 1-based column of the unused identifier itself, so when the
+    name is found exactly there it is prefixed in place whatever construct declares
+    it; the regex patterns are only a fallback for when the column doesn't line up.
+
+    Works on the raw UTF-8 bytes of the line so files are never decoded; note ESLint
+    columns count characters, so a non-ASCII prefix simply falls back to the patterns.
 
-        if line_num < 1 or line_num > len(lines):
-            return False, f"Line {line_num} out of range"
+    Returns (success, message, new_line); new_line is None when the line is unchanged.
+    """
+    name = var_name.encode('utf-8')
 
-        line_idx = line_num - 1
-        line = lines[line_idx]
+    if var_name.startswith('_'):
+        return True, "Already prefixed", None
 
-        # Skip if already has underscore
-        if var_name.startswith('_'):
-            return True, "Already prefixed"
+    if column is not None:
+        start = column - 1
+        if line[start:start + len(name)] == name:
+            return True, "Fixed", line[:start] + b'_' + line[start:]
+        # Already prefixed at exactly this column (e.g. by an earlier run)
+        if line[start:start + len(name) + 1] == b'_' + name:
+            return True, "Already prefixed", None
 
-        # Patterns for variable declarations
-        patterns = [
-            (rf'\b(const|let|var)\s+{re.escape(var_name)}\b', rf'\1 _{var_name}'),
-            (rf'\(([^,)]*,\s*)?{re.escape(var_name)}([,\s)])', rf'(\1_{var_name}\2'),
-            (rf'{{\s*{re.escape(var_name)}\s*([,}}])', rf'{{ _{var_name}\1'),
-        ]
+    # Skip if already has underscore, unless the bare name still occurs elsewhere on the
+    # line (e.g. `_a;  a;`), in which case the prefixed one is a different occurrence
+    if prefixed_pattern(var_name).search(line) and not bare_pattern(var_name).search(line):
+        return True, "Already prefixed", None
 
-        original_line = line
-        for pattern, replacement in patterns:
-            new_line = re.sub(pattern, replacement, line)
-            if new_line != line:
-                lines[line_idx] = new_line
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.writelines(lines)
-                return True, "Fixed"
+    for pattern, replacement in compiled_patterns(var_name):
+        new_line = pattern.sub(replacement, line)
+        if new_line != line:
+            return True, "Fixed", new_line
 
-        return False, f"No pattern matched for line: {line.strip()[:60]}"
+    return False, f"No pattern matched for line: {line.decode('utf-8', 'replace').strip()[:60]}", None
+
+def fix_file_batch(file_path, fixes, content=None):
+    """Apply all (line_num, column, var_name) fixes to a file with one read and one write.
+
+    Pass `content` when the caller has already read the file. Returns (results, written);
+    results are (line_num, column, var_name, success, message) tuples and written is the
+    new file content, or None when nothing changed.
+    """
+    written = None
+    try:
+        if content is None:
+            content = Path(file_path).read_bytes()
+
+        # Start offset of every line (plus end of file); lines are sliced out only when fixed
+        line_offsets = [0] + [m.end() for m in NEWLINE_RE.finditer(content)]
+        if line_offsets[-1] != len(content):
+            line_offsets.append(len(content))
+        line_count = len(line_offsets) - 1
+
+        # Drop exact duplicate reports; the same name at another column on the line
+        # (e.g. a shadowed parameter) is a distinct declaration and is kept
+        unique = set(fixes)
+
+        results = []
+        edited = {}
+        # Right-to-left within a line so earlier inserts don't shift later columns
+        for line_num, column, var_name in sorted(unique, key=lambda fix: (fix[0], -fix[1])):
+            if line_num < 1 or line_num > line_count:
+                results.append((line_num, column, var_name, False, f"Line {line_num} out of range"))
+                continue
+
+            if line_num in edited:
+                line = edited[line_num]
+            else:
+                line = content[line_offsets[line_num - 1]:line_offsets[line_num]]
+            success, message, new_line = fix_unused_var(line, var_name, column)
+            if new_line is not None:
+                edited[line_num] = new_line
+            results.append((line_num, column, var_name, success, message))
+
+        # Only rewrite the file if at least one line actually changed, splicing
+        # the edited lines between untouched slices of the original content
+        if edited:
+            pieces = []
+            pos = 0
+            for line_num in sorted(edited):
+                pieces.append(content[pos:line_offsets[line_num - 1]])
+                pieces.append(edited[line_num])
+                pos = line_offsets[line_num]
+            pieces.append(content[pos:])
+            new_content = b''.join(pieces)
+            Path(file_path).write_bytes(new_content)
+            written = new_content
+
+        return results, written
 
     except Exception as e:
-        return False, str(e)
+        return [(line_num, column, var_name, False, str(e)) for line_num, column, var_name in fixes], written
 
 def main():
     print("Running ESLint...")
-    output = run_eslint()
-
-    print("\nParsing errors...")
-    errors = parse_eslint_output(output)
+    errors = parse_eslint_report(run_eslint())
 
     print(f"\nFound {len(errors)} no-unused-vars errors to fix\n")
 
     fixed = 0
     failed = 0
-
-    for error in errors:
-        success, message = fix_unused_var(error['file'], error['line'], error['var'])
-        if success:
-            print(f"✓ {error['file']}:{error['line']} - {error['var']}")
-            fixed += 1
-        else:
-            print(f"✗ {error['file']}:{error['line']} - {error['var']} - {message}")
-            failed += 1
+    cached = 0
+
+    # Group errors by file so each file is read and written only once
+    fixes_by_file = defaultdict(list)
+    for file_path, line_num, column, var_name in errors:
+        fixes_by_file[file_path].append((line_num, column, var_name))
+
+    # Per-fix lines are buffered and written once, not one write per error
+    out = []
+
+    # Skip fixes already applied to files that haven't changed since the last run
+    cache = fix_cache.init_db()
+    for file_path, fixes in fixes_by_file.items():
+        content, sha, pending, cached_fixes = fix_cache.split_cached(cache, file_path, fixes)
+        cached += len(cached_fixes)
+        results, written = fix_file_batch(file_path, pending, content) if pending else ([], None)
+        fix_cache.record_results(cache, file_path, sha, cached_fixes, results, written)
+
+        for line_num, _, var_name, success, message in results:
+            if success:
+                out.append(f"✓ {file_path}:{line_num} - {var_name}")
+                fixed += 1
+            else:
+                out.append(f"✗ {file_path}:{line_num} - {var_name} - {message}")
+                failed += 1
+
+    if out:
+        sys.stdout.write('\n'.join(out))
+        sys.stdout.write('\n')
 
     print(f"\n{'='*60}")
     print(f"Fixed: {fixed}")
     print(f"Failed: {failed}")
+    print(f"Cached: {cached}")
     print(f"Total: {len(errors)}")
 
+    cache.close()
+
 if __name__ == "__main__":
     main()
@@ -1,97 +1,189 @@
 #!/usr/bin/env python3
 """Parse ESLint output file and fix all no-unused-vars errors."""
 
+import functools
 import re
+import sys
+from collections import defaultdict
 from pathlib import Path
 
+import fix_cache
+
+# Patterns - order matters!
+PATTERN_TEMPLATES = [
+    # const/let/var declarations with assignment
+    (r'\b(const|let|var)\s+{v}\s*=', r'\1 _{v} ='),
+    # const/let/var declarations without assignment
+    (r'\b(const|let|var)\s+{v}\s*;', r'\1 _{v};'),
+    # Import statements - default imports
+    (r'\bimport\s+{v}\s+from', r'import _{v} from'),
+    # Import statements - named imports
+    (r'\bimport\s+{{\s*{v}\s*}}', r'import {{ _{v} }}'),
+    (r'{{\s*{v}\s*,', r'{{ _{v},'),
+    (r',\s*{v}\s*}}', r', _{v} }}'),
+    (r',\s*{v}\s*,', r', _{v},'),
+    # Object property methods (e.g., methodName: async () => { or methodName: function() {)
+    (r'^\s*{v}:\s*', r' _{v}: '),
+    # Function declarations
+    (r'\b(async\s+)?function\s+{v}\s*\(', r'\1function _{v}('),
+    # Destructuring in declarations
+    (r'\b(const|let|var)\s*{{\s*{v}\s*}}', r'\1 {{ _{v} }}'),
+    # Destructured object properties (standalone)
+    (r'^\s*{v},\s*$', r' _{v},'),
+    # Function parameters
+    (r'\(([^,)]*),\s*{v}\s*\)', r'(\1, _{v})'),
+    (r'\({v}\s*,', r'(_{v},'),
+    # Method parameters in classes
+    (r'{v}\s*\(([^)]*)\)\s*{{', r'_{v}(\1) {{'),
+    # Arrow function single param
+    (r'^(\s*){v}\s*=>', r'\1_{v} =>'),
+    # Assignments without declaration (e.g., hitRateLimit = true;)
+    (r'^\s*{v}\s*=', r' _{v} ='),
+    # Increment/decrement (e.g., totalRequests++;)
+    (r'^\s*{v}(\+\+|--);', r' _{v}\1;'),
+]
+
+@functools.lru_cache(maxsize=None)
+def compiled_patterns(var_name):
+    """Compile PATTERN_TEMPLATES for a variable name once per run, as bytes patterns."""
+    esc = re.escape(var_name)
+    return [
+        (
+            re.compile(template.format(v=esc).encode('utf-8')),
+            replacement.format(v=var_name).encode('utf-8'),
+        )
+        for template, replacement in PATTERN_TEMPLATES
+    ]
+
+@functools.lru_cache(maxsize=None)
+def prefixed_pattern(var_name):
+    """Match `_name` as a whole identifier, not as the tail of e.g. DB_HOST or user_id."""
+    return re.compile(rb'(?<![\w$])_' + re.escape(var_name.encode('utf-8')) + rb'(?![\w$])')
+
+@functools.lru_cache(maxsize=None)
+def bare_pattern(var_name):
+    """Match the unprefixed name as a whole identifier."""
+    return re.compile(rb'(?<![\w$])' + re.escape(var_name.encode('utf-8')) + rb'(?![\w$])')
+
+NEWLINE_RE = re.compile(rb'\n')
+
+# Stylish-format error line, e.g. "  12:7  error  'foo' is defined but never used"
+LINE_RE = re.compile(r'\s*(\d+):(\d+)\s+error\s+\'([^\']+)\'')
+
 def parse_eslint_file(filename):
-    """Parse ESLint output to extract no-unused-vars errors."""
+    """Parse ESLint output into (file, line, column, var) no-unused-vars error tuples."""
     errors = []
     current_file = None
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line in f:
-            # Check for file path
-            if line.startswith('C:\\'):
-                current_file = line.strip()
-            # Check for no-unused-vars error
-            elif 'no-unused-vars' in line and current_file:
-                # Extract line number and variable name
-                match = re.match(r'\s*(\d+):\d+\s+error\s+\'([^\']+)\'', line)
-                if match:
-                    line_num = int(match.group(1))
-                    var_name = match.group(2)
-                    errors.append({
-                        'file': current_file,
-                        'line': line_num,
-                        'var': var_name
-                    })
+    # Classify raw byte lines; only decode the few that are file paths or matches
+    data = Path(filename).read_bytes()
+    for raw in data.splitlines():
+        # Check for file path
+        if raw.startswith(b'C:\\'):
+            current_file = sys.intern(raw.decode('utf-8').strip())
+        # Check for no-unused-vars error
+        elif b'no-unused-vars' in raw and current_file:
+            # Extract line number, column and variable name
+            match = LINE_RE.match(raw.decode('utf-8'))
+            if match:
+                line_num = int(match.group(1))
+                column = int(match.group(2))
+                var_name = match.group(3)
+                errors.append((current_file, line_num, column, var_name))
 
     return errors
 
-def fix_unused_var(file_path, line_num, var_name):
-    """Add underscore prefix to a variable declaration."""
+def fix_unused_var(line, var_name, column=None):
+    """Add underscore prefix to a variable declaration on a single line.
+
+    ESLint reports the 1-based column of the unused identifier itself, so when the
+    name is found exactly there it is prefixed in place whatever construct declares
+    it; the regex patterns are only a fallback for when the column doesn't line up.
+
+    Works on the raw UTF-8 bytes of the line so files are never decoded; note ESLint
+    columns count characters, so a non-ASCII prefix simply falls back to the patterns.
+
+    Returns (success, message, new_line); new_line is None when the line is unchanged.
+    """
+    name = var_name.encode('utf-8')
+
+    if column is not None:
+        start = column - 1
+        if line[start:start + len(name)] == name:
+            return True, "Fixed", line[:start] + b'_' + line[start:]
+        # Already prefixed at exactly this column (e.g. by an earlier run)
+        if line[start:start + len(name) + 1] == b'_' + name:
+            return True, "Already prefixed", None
+
+    # Skip if already has underscore, unless the bare name still occurs elsewhere on the
+    # line (e.g. `_a;  a;`), in which case the prefixed one is a different occurrence
+    if prefixed_pattern(var_name).search(line) and not bare_pattern(var_name).search(line):
+        return True, "Already prefixed", None
+
+    for pattern, replacement in compiled_patterns(var_name):
+        new_line, n = pattern.subn(replacement, line, count=1)
+        if n:
+            return True, "Fixed", new_line
+
+    return False, f"No pattern matched: {line.decode('utf-8', 'replace').strip()[:80]}", None
+
+def fix_file_batch(file_path, fixes, content=None):
+    """Apply all (line_num, column, var_name) fixes to a file with one read and one write.
+
+    Pass `content` when the caller has already read the file. Returns (results, written);
+    results are (line_num, column, var_name, success, message) tuples and written is the
+    new file content, or None when nothing changed.
+    """
+    written = None
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        if line_num < 1 or line_num > len(lines):
-            return False, f"Line {line_num} out of range"
-
-        line_idx = line_num - 1
-        line = lines[line_idx]
-
-        # Skip if already has underscore
-        if f'_{var_name}' in line:
-            return True, "Already prefixed"
-
-        # Patterns - order matters!
-        patterns = [
-            # const/let/var declarations with assignment
-            (rf'\b(const|let|var)\s+{re.escape(var_name)}\s*=', rf'\1 _{var_name} ='),
-            # const/let/var declarations without assignment
-            (rf'\b(const|let|var)\s+{re.escape(var_name)}\s*;', rf'\1 _{var_name};'),
-            # Import statements - default imports
-            (rf'\bimport\s+{re.escape(var_name)}\s+from', rf'import _{var_name} from'),
-            # Import statements - named imports
-            (rf'\bimport\s+{{\s*{re.escape(var_name)}\s*}}', rf'import {{ _{var_name} }}'),
-            (rf'{{\s*{re.escape(var_name)}\s*,', rf'{{ _{var_name},'),
-            (rf',\s*{re.escape(var_name)}\s*}}', rf', _{var_name} }}'),
-            (rf',\s*{re.escape(var_name)}\s*,', rf', _{var_name},'),
-            # Object property methods (e.g., methodName: async () => { or methodName: function() {)
-            (rf'^\s*{re.escape(var_name)}:\s*', rf' _{var_name}: '),
-            # Function declarations
-            (rf'\b(async\s+)?function\s+{re.escape(var_name)}\s*\(', rf'\1function _{var_name}('),
-            # Destructuring in declarations
-            (rf'\b(const|let|var)\s*{{\s*{re.escape(var_name)}\s*}}', rf'\1 {{ _{var_name} }}'),
-            # Destructured object properties (standalone)
-            (rf'^\s*{re.escape(var_name)},\s*$', rf' _{var_name},'),
-            # Function parameters
-            (rf'\(([^,)]*),\s*{re.escape(var_name)}\s*\)', rf'(\1, _{var_name})'),
-            (rf'\({re.escape(var_name)}\s*,', rf'(_{var_name},'),
-            # Method parameters in classes
-            (rf'{re.escape(var_name)}\s*\(([^)]*)\)\s*{{', rf'_{var_name}(\1) {{'),
-            # Arrow function single param
-            (rf'^(\s*){re.escape(var_name)}\s*=>', rf'\1_{var_name} =>'),
-            # Assignments without declaration (e.g., hitRateLimit = true;)
-            (rf'^\s*{re.escape(var_name)}\s*=', rf' _{var_name} ='),
-            # Increment/decrement (e.g., totalRequests++;)
-            (rf'^\s*{re.escape(var_name)}(\+\+|--);', rf' _{var_name}\1;'),
-        ]
-
-        original_line = line
-        for pattern, replacement in patterns:
-            new_line = re.sub(pattern, replacement, line)
-            if new_line != line:
-                lines[line_idx] = new_line
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.writelines(lines)
-                return True, "Fixed"
-
-        return False, f"No pattern matched: {line.strip()[:80]}"
+        if content is None:
+            content = Path(file_path).read_bytes()
+
+        # Start offset of every line (plus end of file); lines are sliced out only when fixed
+        line_offsets = [0] + [m.end() for m in NEWLINE_RE.finditer(content)]
+        if line_offsets[-1] != len(content):
+            line_offsets.append(len(content))
+        line_count = len(line_offsets) - 1
+
+        # Drop exact duplicate reports; the same name at another column on the line
+        # (e.g. a shadowed parameter) is a distinct declaration and is kept
+        unique = set(fixes)
+
+        results = []
+        edited = {}
+        # Right-to-left within a line so earlier inserts don't shift later columns
+        for line_num, column, var_name in sorted(unique, key=lambda fix: (fix[0], -fix[1])):
+            if line_num < 1 or line_num > line_count:
+                results.append((line_num, column, var_name, False, f"Line {line_num} out of range"))
+                continue
+
+            if line_num in edited:
+                line = edited[line_num]
+            else:
+                line = content[line_offsets[line_num - 1]:line_offsets[line_num]]
+            success, message, new_line = fix_unused_var(line, var_name, column)
+            if new_line is not None:
+                edited[line_num] = new_line
+            results.append((line_num, column, var_name, success, message))
+
+        # Only rewrite the file if at least one line actually changed, splicing
+        # the edited lines between untouched slices of the original content
+        if edited:
+            pieces = []
+            pos = 0
+            for line_num in sorted(edited):
+                pieces.append(content[pos:line_offsets[line_num - 1]])
+                pieces.append(edited[line_num])
+                pos = line_offsets[line_num]
+            pieces.append(content[pos:])
+            new_content = b''.join(pieces)
+            Path(file_path).write_bytes(new_content)
+            written = new_content
+
+        return results, written
 
     except Exception as e:
-        return False, str(e)
+        return [(line_num, column, var_name, False, str(e)) for line_num, column, var_name in fixes], written
 
 def main():
     print("Parsing ESLint output...")
@@ -101,26 +193,49 @@ def main():
 
     fixed = 0
     failed = 0
+    cached = 0
     skipped = 0
 
-    for error in errors:
-        success, message = fix_unused_var(error['file'], error['line'], error['var'])
-        if success:
-            if "Already" in message:
-                skipped += 1
+    # Group errors by file so each file is read and written only once
+    fixes_by_file = defaultdict(list)
+    for file_path, line_num, column, var_name in errors:
+        fixes_by_file[file_path].append((line_num, column, var_name))
+
+    # Per-fix lines are buffered and written once, not one write per error
+    out = []
+
+    # Skip fixes already applied to files that haven't changed since the last run
+    cache = fix_cache.init_db()
+    for file_path, fixes in fixes_by_file.items():
+        content, sha, pending, cached_fixes = fix_cache.split_cached(cache, file_path, fixes)
+        cached += len(cached_fixes)
+        results, written = fix_file_batch(file_path, pending, content) if pending else ([], None)
+        fix_cache.record_results(cache, file_path, sha, cached_fixes, results, written)
+
+        for line_num, _, var_name, success, message in results:
+            if success:
+                if "Already" in message:
+                    skipped += 1
+                else:
+                    out.append(f"[OK] {Path(file_path).name}:{line_num} - {var_name}")
+                    fixed += 1
             else:
-                print(f"[OK] {Path(error['file']).name}:{error['line']} - {error['var']}")
-                fixed += 1
-        else:
-            print(f"[FAIL] {Path(error['file']).name}:{error['line']} - {error['var']}")
-            print(f"  {message}")
-            failed += 1
+                out.append(f"[FAIL] {Path(file_path).name}:{line_num} - {var_name}")
+                out.append(f"  {message}")
+                failed += 1
+
+    if out:
+        sys.stdout.write('\n'.join(out))
+        sys.stdout.write('\n')
 
     print(f"\n{'='*60}")
     print(f"Fixed: {fixed}")
     print(f"Skipped: {skipped}")
     print(f"Failed: {failed}")
+    print(f"Cached: {cached}")
     print(f"Total: {len(errors)}")
 
+    cache.close()
+
 if __name__ == "__main__":
     main()
@@ -4,9 +4,33 @@ Safely fix ESLint no-unused-vars errors by adding underscore prefixes.
 Only modifies variable declarations, not usages.
 """
 
+import functools
 import re
 import sys
 
+# Common patterns for variable declarations
+PATTERN_TEMPLATES = [
+    # const/let/var declarations
+    (r'\b(const|let|var)\s+{v}\b', r'\1 _{v}'),
+    # Function parameters
+    (r'\({v}\b', r'(_{v}'),
+    (r',\s*{v}\b', r', _{v}'),
+    # Destructuring
+    (r'{{\s*{v}\b', r'{{ _{v}'),
+    (r',\s*{v}\s*}}', r', _{v} }}'),
+    # Arrow function params
+    (r'\({v}\s*\)', r'(_{v})'),
+]
+
+@functools.lru_cache(maxsize=None)
+def compiled_patterns(var_name):
+    """Compile PATTERN_TEMPLATES for a variable name once per run."""
+    esc = re.escape(var_name)
+    return [
+        (re.compile(template.format(v=esc)), replacement.format(v=var_name))
+        for template, replacement in PATTERN_TEMPLATES
+    ]
+
 def fix_unused_var(file_path, line_num, var_name):
     """Add underscore prefix to a variable declaration at a specific line."""
     try:
@@ -25,25 +49,18 @@ def fix_unused_var(file_path, line_num, var_name):
             print(f"Skipping {var_name} - already has underscore prefix")
             return True
 
-        # Common patterns for variable declarations
-        patterns = [
-            # const/let/var declarations
-            (rf'\b(const|let|var)\s+{re.escape(var_name)}\b', rf'\1 _{var_name}'),
-            # Function parameters
-            (rf'\({re.escape(var_name)}\b', rf'(_{var_name}'),
-            (rf',\s*{re.escape(var_name)}\b', rf', _{var_name}'),
-            # Destructuring
-            (rf'{{\s*{re.escape(var_name)}\b', rf'{{ _{var_name}'),
-            (rf',\s*{re.escape(var_name)}\s*}}', rf', _{var_name} }}'),
-            # Arrow function params
-            (rf'\({re.escape(var_name)}\s*\)', rf'(_{var_name})'),
-        ]
-
+        # Stop at the first pattern that matches; later ones would only re-scan
+        # (or double-prefix) a line that's already fixed
         original_line = line
-        for pattern, replacement in patterns:
-            line = re.sub(pattern, replacement, line)
+        modified = False
+        for pattern, replacement in compiled_patterns(var_name):
+            new_line, n = pattern.subn(replacement, line)
+            if n:
+                line = new_line
+                modified = True
+                break
 
-        if line != original_line:
+        if modified:
             lines[line_idx] = line
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.writelines(lines)
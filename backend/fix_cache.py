@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of no-unused-vars fixes shared by the fix-*.py scripts.
+
+Each row records that (file, line, var) is already handled in the file content
+with the given fingerprint, so re-running against the same ESLint output can
+skip files that haven't changed since they were fixed.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Anchored next to the scripts so the cache doesn't follow the working directory
+DEFAULT_DB_PATH = Path(__file__).parent / '.fix-cache.sqlite'
+
+def init_db(path=DEFAULT_DB_PATH):
+    """Open (creating if needed) the fix cache database."""
+    conn = sqlite3.connect(path)
+    # Caches written before fixes were keyed by column lack it; they're safe to discard
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(fixes)')]
+    if columns and 'col' not in columns:
+        conn.execute('DROP TABLE fixes')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS fixes ('
+        'file TEXT, sha TEXT, line INT, col INT, var TEXT, '
+        'PRIMARY KEY (file, sha, line, col, var))'
+    )
+    return conn
+
+def fingerprint(data):
+    """Hash file bytes; xxhash when installed, sha256 otherwise (not security-critical)."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.sha256(data).hexdigest()
+
+def is_fixed(conn, file_path, sha, line_num, column, var_name):
+    """Return True if this fix is already recorded for this exact file content."""
+    row = conn.execute(
+        'SELECT 1 FROM fixes WHERE file=? AND sha=? AND line=? AND col=? AND var=?',
+        (file_path, sha, line_num, column, var_name)
+    ).fetchone()
+    return row is not None
+
+def record_fixes(conn, file_path, sha, fixes):
+    """Record (line_num, column, var_name) fixes as applied to the file content with this sha."""
+    conn.executemany(
+        'INSERT OR IGNORE INTO fixes (file, sha, line, col, var) VALUES (?, ?, ?, ?, ?)',
+        [(file_path, sha, line_num, column, var_name) for line_num, column, var_name in fixes]
+    )
+    conn.commit()
+
+def split_cached(conn, file_path, fixes):
+    """Read the file once and split (line_num, column, var_name) fixes against its content.
+
+    Returns (content, sha, pending, cached); content and sha are None if the file
+    can't be read, in which case every fix is pending.
+    """
+    try:
+        content = Path(file_path).read_bytes()
+    except OSError:
+        return None, None, list(fixes), []
+
+    sha = fingerprint(content)
+    pending, cached = [], []
+    for fix in fixes:
+        line_num, column, var_name = fix
+        if is_fixed(conn, file_path, sha, line_num, column, var_name):
+            cached.append(fix)
+        else:
+            pending.append(fix)
+    return content, sha, pending, cached
+
+def record_results(conn, file_path, sha, cached, results, written):
+    """Record cached fixes plus successful fix_file_batch results against the file as written.
+
+    `written` is the content fix_file_batch wrote, or None if it left the file untouched.
+    """
+    done = list(cached)
+    done += [(line_num, column, var_name) for line_num, column, var_name, success, _ in results if success]
+    if not done:
+        return
+
+    if written is not None:
+        sha = fingerprint(written)
+    if sha is not None:
+        record_fixes(conn, file_path, sha, done)
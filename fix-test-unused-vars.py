@@ -6,8 +6,34 @@ Only adds underscore prefixes to variables that are clearly unused.
 
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
 
+# Only fix these specific variables that ESLint flagged as unused
+UNUSED_VARS_TO_FIX = [
+    # Test data variables
+    'testUser', 'testPassword', 'testGroom', 'testBreed', 'testHorse',
+    # Response variables in tests
+    'response', 'registerResponse', 'loginResponse',
+    # Token variables
+    'tokenB', 'token1', 'token2', 'token3', 'oldInvalidatedToken', 'newToken',
+    # Mock objects
+    'mockReq', 'mockRes', 'mockNext', 'mockCsrfProtection',
+    # Other test variables
+    'result', 'now', 'csrfToken', 'csrfCookie', 'executeData',
+    'userId', 'horseId', 'res', 'next', 'headers', 'checks',
+    'before', 'after', 'hitRateLimit', 'expectedKeyPattern',
+    'plainTextEmail', 'htmlEmail', 'initialGroomCount', 'totalRequests',
+    'options', 'exp', 'iat', 'rateLimiter', 'skipAuthFlag',
+    'requireAuthHeader',
+]
+
+# One alternation over every name so each file is scanned once, not once per variable
+UNUSED_DECL_RE = re.compile(
+    r'\b(const|let|var)\s+(' + '|'.join(map(re.escape, UNUSED_VARS_TO_FIX)) + r')\s*='
+)
+
 def fix_test_file(file_path):
     """Add underscore prefix to specific unused variables in test files."""
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -16,31 +42,13 @@ def fix_test_file(file_path):
     original_content = content
     changes = []
 
-    # Only fix these specific variables that ESLint flagged as unused
-    unused_vars_to_fix = [
-        # Test data variables
-        'testUser', 'testPassword', 'testGroom', 'testBreed', 'testHorse',
-        # Response variables in tests
-        'response', 'registerResponse', 'loginResponse',
-        # Token variables
-        'tokenB', 'token1', 'token2', 'token3', 'oldInvalidatedToken', 'newToken',
-        # Mock objects
-        'mockReq', 'mockRes', 'mockNext', 'mockCsrfProtection',
-        # Other test variables
-        'result', 'now', 'csrfToken', 'csrfCookie', 'executeData',
-        'userId', 'horseId', 'res', 'next', 'headers', 'checks',
-        'before', 'after', 'hitRateLimit', 'expectedKeyPattern',
-        'plainTextEmail', 'htmlEmail', 'initialGroomCount', 'totalRequests',
-        'options', 'exp', 'iat', 'rateLimiter', 'skipAuthFlag',
-        'requireAuthHeader',
-    ]
-
     # Fix variable declarations: const varName = ...
-    for var_name in unused_vars_to_fix:
-        pattern = rf'\b(const|let|var)\s+{var_name}\s*='
-        if re.search(pattern, content):
-            content = re.sub(pattern, rf'\1 _{var_name} =', content)
-            changes.append(f"{var_name} -> _{var_name}")
+    def prefix_declaration(match):
+        keyword, var_name = match.group(1), match.group(2)
+        changes.append(f"{var_name} -> _{var_name}")
+        return f'{keyword} _{var_name} ='
+
+    content = UNUSED_DECL_RE.sub(prefix_declaration, content)
 
     if content != original_content:
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -49,6 +57,14 @@ def fix_test_file(file_path):
 
     return 0, []
 
+def try_fix_test_file(file_path):
+    """Process pool worker: run fix_test_file and return the error instead of raising it."""
+    try:
+        num_changes, changes = fix_test_file(file_path)
+        return file_path, num_changes, changes, None
+    except Exception as e:
+        return file_path, 0, [], e
+
 def main():
     backend_dir = Path('backend')
 
@@ -60,18 +76,23 @@ def main():
         'tests/**/*.js',
     ]
 
-    test_files = []
-    for pattern in test_patterns:
-        test_files.extend(backend_dir.glob(pattern))
+    # Stream paths straight from the globs so workers start before the walk finishes
+    test_files = chain.from_iterable(backend_dir.glob(pattern) for pattern in test_patterns)
 
     total_changes = 0
     files_changed = 0
+    files_scanned = 0
 
-    print(f"Scanning {len(test_files)} test files...")
+    print("Scanning test files...")
 
-    for test_file in test_files:
-        try:
-            num_changes, changes = fix_test_file(test_file)
+    # Each file is an independent job; use processes since regex work holds the GIL
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(try_fix_test_file, test_files, chunksize=32)
+        for test_file, num_changes, changes, e in results:
+            files_scanned += 1
+            if e is not None:
+                print(f"[ERR] {test_file}: {e}")
+                continue
             if num_changes > 0:
                 files_changed += 1
                 total_changes += num_changes
@@ -80,11 +101,9 @@ def main():
                     print(f"  - {change}")
                 if len(changes) > 5:
                     print(f"  ... and {len(changes) - 5} more")
-        except Exception as e:
-            print(f"[ERR] {test_file}: {e}")
 
     print(f"\n{'='*60}")
-    print(f"Summary: {total_changes} changes in {files_changed} files")
+    print(f"Summary: {total_changes} changes in {files_changed} of {files_scanned} files")
     print(f"{'='*60}")
 
 if __name__ == '__main__':
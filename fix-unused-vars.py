@@ -6,8 +6,57 @@ Fix ESLint no-unused-vars errors by adding underscore prefixes to unused variabl
 import re
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Pattern for unused variable declarations (const, let, var)
+# Match patterns like: const variableName = ...
+UNUSED_VARS = {
+    'testUser', 'testPassword', 'testGroom', 'testBreed', 'response',
+    'registerResponse', 'loginResponse', 'tokenB', 'token1', 'token2',
+    'token3', 'result', 'now', 'newToken', 'oldInvalidatedToken',
+    'csrfToken', 'csrfCookie', 'executeData', 'mockReq', 'mockRes',
+    'mockNext', 'rateLimiter', 'userId', 'horseId', 'res', 'next',
+    'headers', 'checks', 'before', 'after', 'hitRateLimit',
+    'expectedKeyPattern', 'plainTextEmail', 'htmlEmail', 'initialGroomCount',
+    'totalRequests', 'options', 'mockCsrfProtection', 'exp', 'iat'
+}
+
+# Pattern for unused imports
+UNUSED_IMPORTS = {
+    'jest', 'expect', 'afterEach', 'readFileSync', 'prisma', 'request',
+    'findOwnedResource', 'trackResource', 'untrackResource', 'YAML',
+    'ResponseCacheService', 'requestTimeoutMiddleware', 'memoryMonitoringMiddleware',
+    'databaseConnectionMiddleware', 'createResourceManagementMiddleware',
+    'rateLimit', 'logger', 'jwt', 'join', 'invalidateTokenFamily',
+    'generateToken', 'generateRefreshToken', 'generateDocumentation',
+    'Gauge', 'fs', 'extractCookieValue', 'getCsrfToken', 'sleep',
+    'createMockUser', 'createMockHorse', 'createMockGroom',
+    'createMalformedToken', 'createLoginData', 'closeRedis',
+    'authRateLimiter', 'authHeader', 'applyRareTraitBoosterEffects',
+    'ApiResponse', 'analyzeTraitTrends', 'identifyTraitPatterns',
+    'hasUltraRareAbility', 'getMemoryReport', 'getEnvironmentalHistory',
+    'generateTrendPredictions', 'discoverTraits', 'EPIGENETIC_FLAG_DEFINITIONS',
+    'path'
+}
+
+# Fused alternations: one scan per file finds any listed name instead of one scan per name
+UNUSED_DECL_RE = re.compile(
+    r'\b(const|let|var)\s+(' + '|'.join(map(re.escape, sorted(UNUSED_VARS, key=len, reverse=True))) + r')\s*='
+)
+# Names are skipped after '.' so member accesses like req.path aren't renamed
+UNUSED_IMPORT_NAME_RE = re.compile(
+    r'(?<![.\w$])(' + '|'.join(map(re.escape, sorted(UNUSED_IMPORTS, key=len, reverse=True))) + r')(?![\w$])'
+)
+# Only the braces of an import (optionally after a default binding, as in
+# `import fs, { existsSync }`) or a const/let/var destructuring, never blocks or object literals
+BRACE_GROUP_RE = re.compile(r'(?:\bimport\s+(?:[\w$]+\s*,\s*)?|\b(?:const|let|var)\s*)\{[^}]*\}')
+
+# Directories skipped entirely when walking the backend tree; anything with
+# 'coverage' in its name (coverage-temp/, coverage-report.mjs, ...) is skipped too
+PRUNE_DIRS = {'node_modules', '.git', '.jest-cache'}
+SKIP_NAME_PART = 'coverage'
+
 def fix_unused_vars(file_path):
     """Add underscore prefix to unused variables in a file."""
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -16,64 +65,30 @@ def fix_unused_vars(file_path):
     original_content = content
     changes = []
 
-    # Pattern for unused variable declarations (const, let, var)
-    # Match patterns like: const variableName = ...
-    unused_vars = {
-        'testUser', 'testPassword', 'testGroom', 'testBreed', 'response',
-        'registerResponse', 'loginResponse', 'tokenB', 'token1', 'token2',
-        'token3', 'result', 'now', 'newToken', 'oldInvalidatedToken',
-        'csrfToken', 'csrfCookie', 'executeData', 'mockReq', 'mockRes',
-        'mockNext', 'rateLimiter', 'userId', 'horseId', 'res', 'next',
-        'headers', 'checks', 'before', 'after', 'hitRateLimit',
-        'expectedKeyPattern', 'plainTextEmail', 'htmlEmail', 'initialGroomCount',
-        'totalRequests', 'options', 'mockCsrfProtection', 'exp', 'iat'
-    }
-
-    # Pattern for unused imports
-    unused_imports = {
-        'jest', 'expect', 'afterEach', 'readFileSync', 'prisma', 'request',
-        'findOwnedResource', 'trackResource', 'untrackResource', 'YAML',
-        'ResponseCacheService', 'requestTimeoutMiddleware', 'memoryMonitoringMiddleware',
-        'databaseConnectionMiddleware', 'createResourceManagementMiddleware',
-        'rateLimit', 'logger', 'jwt', 'join', 'invalidateTokenFamily',
-        'generateToken', 'generateRefreshToken', 'generateDocumentation',
-        'Gauge', 'fs', 'extractCookieValue', 'getCsrfToken', 'sleep',
-        'createMockUser', 'createMockHorse', 'createMockGroom',
-        'createMalformedToken', 'createLoginData', 'closeRedis',
-        'authRateLimiter', 'authHeader', 'applyRareTraitBoosterEffects',
-        'ApiResponse', 'analyzeTraitTrends', 'identifyTraitPatterns',
-        'hasUltraRareAbility', 'getMemoryReport', 'getEnvironmentalHistory',
-        'generateTrendPredictions', 'discoverTraits', 'EPIGENETIC_FLAG_DEFINITIONS',
-        'path'
-    }
-
     # Fix unused variable declarations
-    for var_name in unused_vars:
-        # Match variable declarations: const varName = ..., let varName = ..., var varName = ...
-        pattern = rf'\b(const|let|var)\s+{var_name}\s*='
-        if re.search(pattern, content):
-            content = re.sub(pattern, rf'\1 _{var_name} =', content)
-            changes.append(f"Variable: {var_name} -> _{var_name}")
-
-    # Fix unused imports from destructuring
-    for var_name in unused_imports:
-        # Match in destructuring: { varName, other } or { varName }
-        pattern = rf'\{{\s*([^}}]*\b){var_name}(\b[^}}]*)\}}'
-        matches = list(re.finditer(pattern, content))
-        for match in matches:
-            before = match.group(1).strip()
-            after = match.group(2).strip()
-            # Add underscore if it's the only import or in a list
-            if before or after.replace(',', '').strip():
-                new_import = f"{{{before}_{var_name}{after}}}"
-            else:
-                new_import = f"{{_{var_name}}}"
-            content = content[:match.start()] + new_import + content[match.end():]
-            changes.append(f"Import: {var_name} -> _{var_name}")
+    def prefix_declaration(match):
+        keyword, var_name = match.group(1), match.group(2)
+        changes.append(f"Variable: {var_name} -> _{var_name}")
+        return f'{keyword} _{var_name} ='
+
+    content = UNUSED_DECL_RE.sub(prefix_declaration, content)
+
+    # Fix unused imports from destructuring: { varName, other } or { varName }
+    def prefix_import(match):
+        var_name = match.group(1)
+        changes.append(f"Import: {var_name} -> _{var_name}")
+        return f'_{var_name}'
+
+    content = BRACE_GROUP_RE.sub(
+        lambda group: UNUSED_IMPORT_NAME_RE.sub(prefix_import, group.group(0)),
+        content,
+    )
 
     # Fix function parameters that are unused
     # Pattern: function(param1, unusedParam, param3)
     for var_name in ['options']:
+        if var_name not in content:
+            continue
         pattern = rf'\(([^)]*)\b{var_name}\b([^)]*)\)'
         matches = list(re.finditer(pattern, content))
         for match in matches:
@@ -90,25 +105,45 @@ def fix_unused_vars(file_path):
 
     return 0, []
 
+def try_fix_unused_vars(file_path):
+    """Process pool worker: run fix_unused_vars and return the error instead of raising it."""
+    try:
+        num_changes, changes = fix_unused_vars(file_path)
+        return file_path, num_changes, changes, None
+    except Exception as e:
+        return file_path, 0, [], e
+
+def iter_js_files(root):
+    """Yield .js/.mjs files under root, pruning skipped directories before descending."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if SKIP_NAME_PART in entry.name:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in PRUNE_DIRS:
+                    continue
+                yield from iter_js_files(entry.path)
+            elif entry.name.endswith(('.js', '.mjs')):
+                yield Path(entry.path)
+
 def main():
     backend_dir = Path('backend')
 
     # Find all .js and .mjs files, excluding node_modules and coverage
-    js_files = []
-    for ext in ['*.js', '*.mjs']:
-        for file in backend_dir.rglob(ext):
-            # Skip node_modules, coverage directories
-            if 'node_modules' not in str(file) and 'coverage' not in str(file):
-                js_files.append(file)
+    js_files = list(iter_js_files(backend_dir))
 
     total_changes = 0
     files_changed = 0
 
     print(f"Scanning {len(js_files)} files...")
 
-    for js_file in js_files:
-        try:
-            num_changes, changes = fix_unused_vars(js_file)
+    # Each file is an independent job; use processes since regex work holds the GIL
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(try_fix_unused_vars, js_files, chunksize=32)
+        for js_file, num_changes, changes, e in results:
+            if e is not None:
+                print(f"[ERR] Error processing {js_file}: {e}")
+                continue
             if num_changes > 0:
                 files_changed += 1
                 total_changes += num_changes
@@ -117,8 +152,6 @@ def main():
                     print(f"  - {change}")
                 if len(changes) > 3:
                     print(f"  ... and {len(changes) - 3} more")
-        except Exception as e:
-            print(f"[ERR] Error processing {js_file}: {e}")
 
     print(f"\n{'='*60}")
     print(f"Summary: {total_changes} changes in {files_changed} files")